@@ -12,16 +12,33 @@ from langchain.prompts import PromptTemplate
 from dotenv import load_dotenv
 # langchain_core.output_parsers: these help get the output from the LLM into a format we can actually use, like a simple string or JSON.
 from langchain_core.output_parsers import StrOutputParser, JsonOutputParser
-# bs4 (BeautifulSoup): this helps clean up the messy HTML code from a website and pull out the text.
-from bs4 import BeautifulSoup
+# lxml.html: this helps clean up the messy HTML code from a website and pull out the text. its written in C so its really fast.
+import lxml.html
+# ParserError: what lxml raises when it cant make a page out of the HTML at all (like an empty page).
+from lxml.etree import ParserError
 # requests: this is for grabbing data from a URL, like the HTML of a webpage.
 import requests
+# HTTPAdapter: lets us set up a pool of connections that requests can keep open and reuse.
+from requests.adapters import HTTPAdapter
 # readability: this library is really good at finding the main article content on a page and getting rid of junk like ads and menus.
 from readability import Document
-# json: the LLM will give us data in JSON format, so we need this to work with it in Python.
-import json
-# re (Regular Expressions): for finding the clean JSON inside the LLM's response, which can sometimes be a bit messy. its a pattern matching tool.
-import re
+# urlparse: splits a URL into its parts so we can tell which website it is from.
+from urllib.parse import urlparse
+# islice: takes just the first N items from a generator without building a full list first.
+from itertools import islice
+# orjson: the LLM will give us data in JSON format, so we need this to work with it in Python. its a faster drop-in for the built-in json module.
+import orjson
+# ThreadPoolExecutor, threading and time: for running the slow stuff (downloading, the LLM) in a background thread.
+from concurrent.futures import ThreadPoolExecutor
+import threading
+import time
+# these let a background thread use streamlit stuff like the cache, by sharing our script context with it.
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+# the name of the spot on a thread where streamlit keeps the script context, so we can clear it again.
+from streamlit.runtime.scriptrunner_utils.script_run_context import SCRIPT_RUN_CONTEXT_ATTR_NAME
+# pydantic: lets us describe exactly what a quiz should look like, so we can show that shape to the LLM
+# and then check that what came back really has that shape.
+from pydantic import BaseModel, TypeAdapter, ValidationError, field_validator
 
 
 
@@ -29,9 +46,115 @@ import re
 # --------------------------------------------------------------------------------
 # Block 2: loading up the API keys and getting set up
 # --------------------------------------------------------------------------------
-# alright, lets load the environment variables.
-# this line will look for a .env file and load any keys inside it.
-load_dotenv()
+# the API keys from the .env file get loaded in 'get_chain' (Block 3), right before the LLM needs them,
+# so it only happens once instead of on every rerun.
+
+# here we make one requests Session that the whole app shares.
+# a Session keeps the connection to the website open (keep-alive), so the next fetch
+# doesnt have to do the slow TCP + TLS handshake all over again.
+# st.cache_resource makes sure we only build it once, even though streamlit reruns the script all the time.
+@st.cache_resource
+def get_http_session():
+    session = requests.Session()
+    session.mount("https://", HTTPAdapter(pool_connections=10, pool_maxsize=10))
+    # some news sites block the default python user agent, so we pretend to be a normal browser.
+    session.headers.update({"User-Agent": "Mozilla/5.0 (compatible; AIQuizGenerator/1.0)"})
+    return session
+
+HTTP = get_http_session()
+
+# a small pool of worker threads for the slow jobs. cache_resource again, so we keep the same pool across reruns.
+@st.cache_resource
+def get_executor():
+    return ThreadPoolExecutor(max_workers=4)
+
+EXECUTOR = get_executor()
+
+# runs fn(*args) on one of the worker threads and waits for it in small steps.
+# after every nap we write a little status line on the page (whatever 'status_text' gives back, plus the seconds so far).
+# every time we draw something, streamlit checks if the user clicked Stop or changed something,
+# so the page reacts right away instead of only after the download or the LLM is done.
+# we hand the worker our script context so it can still use streamlit's cache.
+def run_in_background(fn, *args, status_text=lambda: "Working..."):
+    ctx = get_script_run_ctx()
+
+    def task():
+        add_script_run_ctx(threading.current_thread(), ctx)
+        try:
+            return fn(*args)
+        finally:
+            # the worker threads get reused by other users' sessions, so take our context off again.
+            setattr(threading.current_thread(), SCRIPT_RUN_CONTEXT_ATTR_NAME, None)
+
+    status = st.empty()
+    started = time.monotonic()
+    future = EXECUTOR.submit(task)
+    try:
+        while not future.done():
+            time.sleep(0.1)
+            status.caption(f"{status_text()} ({time.monotonic() - started:.1f}s)")
+    finally:
+        status.empty()
+    # .result() gives us the return value, or raises the same error the function raised.
+    return future.result()
+
+# for websites we already know, we know exactly where the article paragraphs live on the page.
+# for those we can skip readability (which has to score the whole page to guess where the article is)
+# and just grab the paragraphs directly. the key is the website, the value is an XPath to the paragraphs.
+SITE_SELECTORS = {
+    "ndtv.com": '//div[contains(@class,"sp-cn")]//p',
+}
+
+# finds the XPath for this url's website, or None if we dont know the site.
+# we check the end of the hostname so "www.ndtv.com" still matches "ndtv.com".
+def get_site_selector(url: str):
+    host = urlparse(url).hostname or ""
+    for site, selector in SITE_SELECTORS.items():
+        if host == site or host.endswith("." + site):
+            return selector
+    return None
+
+# this function does the whole "get the article" job: download -> readability -> plain text.
+# st.cache_data remembers the answer for each URL (for an hour), so if the user clicks
+# "Fetch" again on the same link we skip the download and parsing completely.
+@st.cache_data(ttl=3600, show_spinner=False)
+def fetch_article(url: str) -> str:
+    # our shared session grabs the whole HTML content from that URL.
+    # the timeout is so we dont hang forever if the website is slow.
+    resp = HTTP.get(url, timeout=10)
+    # if the site sent back an error page (blocked us, 404, server down...), stop here with an error.
+    # errors are never cached, so the next click can try again instead of showing the error page for an hour.
+    resp.raise_for_status()
+    html = resp.text
+
+    # the fast way: if we know this website, parse the page once and pull the paragraphs out directly.
+    # we give lxml the raw bytes (resp.content) so it can read the page's own encoding declaration itself.
+    texts = None
+    selector = get_site_selector(url)
+    if selector:
+        try:
+            nodes = lxml.html.fromstring(resp.content).xpath(selector)
+        except (ParserError, ValueError):
+            # lxml couldnt parse the page, so we just let readability have a go below.
+            nodes = []
+        # if the site changed its layout and we found nothing, we just fall back to readability below.
+        if nodes:
+            texts = (p.text_content() for p in nodes)
+
+    if texts is None:
+        # 'readability' takes that HTML and pulls out just the main article content.
+        # html_partial=True gives us just the article <div>, without wrapping it in a whole <html><body> page.
+        clean_html = Document(html).summary(html_partial=True)
+        # 'lxml' takes that clean HTML and builds a tree, then itertext() walks it and gives us just the text bits.
+        texts = lxml.html.fromstring(clean_html).itertext()
+
+    # just cleaning up the text a bit more, getting rid of extra lines and spaces.
+    # we split each text bit into words as we go, so theres no big in-between string, just one pass and one join.
+    words = (word for t in texts for word in t.split())
+    # the prompt tells the LLM the text is max 1500 words, so we actually keep it to 1500.
+    # long pages sometimes drag in captions and related stories, and every extra word makes the LLM slower.
+    # islice also means we stop walking the tree as soon as we have enough words.
+    return " ".join(islice(words, 1500))
 
 
 
@@ -39,9 +162,27 @@ load_dotenv()
 # --------------------------------------------------------------------------------
 # Block 3: getting the LLM (the "brain") and the Prompt ready
 # --------------------------------------------------------------------------------
-# here we're setting up the LLM we're gonna use.
-# we're using Groq's "llama-3.1-8b-instant" model cause its really fast.
-model = ChatGroq(model_name="llama-3.1-8b-instant")
+# this is the shape of one question, and then the shape of the whole quiz.
+# we ask for a JSON object with the questions inside a "questions" key, instead of a bare list.
+class Question(BaseModel):
+    question: str
+    options: dict[str, str]
+    correct_answer: str
+
+    # the correct answer has to be one of the option letters, otherwise nobody could ever get it right.
+    # 'options' is checked before this, so its already in info.data by the time we get here.
+    @field_validator("correct_answer")
+    @classmethod
+    def correct_answer_in_options(cls, v, info):
+        if v not in info.data.get("options", {}):
+            raise ValueError("correct_answer must be one of the option keys")
+        return v
+
+class Quiz(BaseModel):
+    questions: list[Question]
+
+# this checks a plain list of questions, for when we had to dig the list out of the answer ourselves.
+QuestionList = TypeAdapter(list[Question])
 
 # now we're making a script for the LLM to follow.
 # its a PromptTemplate, like a form that we fill out to tell the LLM what to do.
@@ -51,7 +192,8 @@ quiz_from_text_prompt = PromptTemplate(
     input_variables=["num_questions", "article_text"],
     # partial_variables means a part of the template is already pre-filled.
     # here we're telling the LLM the exact JSON format to use so it doesnt mess up.
-    partial_variables={"format_instructions": JsonOutputParser().get_format_instructions()},
+    # we pass our Quiz model so the instructions include the real schema: {"questions": [...]}.
+    partial_variables={"format_instructions": JsonOutputParser(pydantic_object=Quiz).get_format_instructions()},
     # and this is the main script we're giving the LLM. all the rules are here.
     template="""
 You are a quiz generator that must follow the rules strictly.
@@ -73,12 +215,127 @@ Generate the quiz now:
 """
 )
 
-# here we're creating a processing pipeline, they call it a "chain".
-# it just defines the sequence of steps for our data.
-# 1. first, user input goes into the 'quiz_from_text_prompt' to build the full prompt.
-# 2. then, that prompt goes to the 'model' (our LLM).
-# 3. finally, whatever the LLM gives back, 'StrOutputParser' cleans it up into a simple string.
-chain = quiz_from_text_prompt | model | StrOutputParser()
+# streamlit reruns this whole script on every click, and we dont want to reload the .env file
+# and build a brand new LLM client every single time. st.cache_resource builds it all once and keeps it.
+@st.cache_resource
+def get_chain():
+    # alright, lets load the environment variables.
+    # this line will look for a .env file and load any keys inside it.
+    load_dotenv()
+
+    # here we're setting up the LLM we're gonna use.
+    # we're using Groq's "llama-3.1-8b-instant" model cause its really fast.
+    # temperature=0.2 keeps the answers focused (we want facts from the article, not creativity).
+    # max_tokens=1200 is plenty for up to 10 MCQs in JSON, and it stops the model from rambling on, which saves time.
+    # we dont turn on Groq's "JSON mode" here, because Groq cant stream in JSON mode and we stream the answer
+    # to show progress. the prompt already asks for JSON only, and 'extract_json_array' cleans up the rest.
+    model = ChatGroq(
+        model_name="llama-3.1-8b-instant",
+        temperature=0.2,
+        max_tokens=1200
+    )
+
+    # here we're creating a processing pipeline, they call it a "chain".
+    # it just defines the sequence of steps for our data.
+    # 1. first, user input goes into the 'quiz_from_text_prompt' to build the full prompt.
+    # 2. then, that prompt goes to the 'model' (our LLM).
+    # 3. finally, whatever the LLM gives back, 'StrOutputParser' cleans it up into a simple string.
+    return quiz_from_text_prompt | model | StrOutputParser()
+
+chain = get_chain()
+
+# backup plan for when the LLM adds extra text around the JSON.
+# we walk the whole answer once, counting '[' and ']' to find each complete top-level list.
+# we keep track of "quotes" from the very start, so a bracket inside any string doesnt confuse the count.
+# some lists might just be normal text like "[5 questions]", so we only keep the first one that is real JSON.
+# it gives back the parsed list, or None if there isnt one.
+def extract_json_array(s: str):
+    start = None
+    depth = 0
+    in_string = False
+    escaped = False
+    for i, ch in enumerate(s):
+        if in_string:
+            if escaped:
+                escaped = False
+            elif ch == '\\':
+                escaped = True
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+        elif ch == '[':
+            if depth == 0:
+                start = i
+            depth += 1
+        elif ch == ']' and depth > 0:
+            depth -= 1
+            if depth == 0:
+                try:
+                    candidate = orjson.loads(s[start:i + 1])
+                except orjson.JSONDecodeError:
+                    # not JSON (just text in brackets), keep looking after it.
+                    continue
+                if isinstance(candidate, list):
+                    return candidate
+    # we never found a complete JSON list, so the answer is cut off or not JSON at all.
+    return None
+
+# this function calls the LLM and turns its answer into a list of questions we can use.
+# calling the LLM is the slowest part of the whole app (a few seconds), so we cache it with st.cache_data.
+# if the same article and the same number of questions come in again, we just reuse the old quiz
+# instead of asking the LLM again. if something goes wrong we raise an error, and errors are never cached.
+# '_progress' is a plain dict where we write how many questions are done so far. it starts with an underscore
+# so streamlit leaves it out of the cache key. we never call st.* in here, because st.cache_data would record
+# those calls and try to replay them on a cache hit. the page gets updated from the script thread instead.
+@st.cache_data(ttl=1800, show_spinner=False)
+def generate_quiz(article_text: str, n: int, _progress=None) -> list:
+    # now we call our LLM chain.
+    # we give it the article text and the number of questions the user wants.
+    # we use 'stream' instead of 'invoke' so we get the answer bit by bit as the LLM writes it,
+    # and can show the user how far along it is instead of just a spinner.
+    key = '"question"'
+    chunks = []
+    done = 0
+    # the last few characters of what we already got, in case a "question" key is split across two chunks.
+    tail = ""
+    for chunk in chain.stream({
+        "article_text": article_text,
+        "num_questions": n
+    }):
+        chunks.append(chunk)
+        # every question has a "question" key, so counting them tells us how many are done.
+        # we only look at the new chunk (plus that little tail), not the whole answer again every time.
+        window = tail + chunk
+        done += window.count(key)
+        tail = window[-(len(key) - 1):]
+        if _progress is not None:
+            _progress["done"] = min(done, n)
+    raw_output = "".join(chunks)
+
+    # the prompt asks for nothing but JSON, so usually the whole answer is valid JSON and we can load it straight away.
+    # the list of questions lives under the "questions" key.
+    try:
+        data = orjson.loads(raw_output)
+    except orjson.JSONDecodeError:
+        data = None
+
+    # now we double-check if the LLM gave us good data.
+    # the whole thing has to be a list of questions, and every question has to have a 'question',
+    # 'options' (letter -> text) and a 'correct_answer' that is one of those letters.
+    # pydantic does all of that checking for us in one go, and raises a ValidationError if anything is wrong
+    # (even if "questions" is null, a string, or something else thats not a list).
+    if isinstance(data, dict) and "questions" in data:
+        questions = Quiz.model_validate(data).questions
+    else:
+        # if that didnt work, dig the list of questions out of the answer ourselves.
+        result = extract_json_array(raw_output)
+        if result is None:
+            raise ValueError("Could not find valid JSON. Please try again.")
+        questions = QuestionList.validate_python(result)
+
+    # model_dump() turns each one back into a plain dict, which is what the rest of the app uses.
+    return [q.model_dump() for q in questions]
 
 
 
@@ -125,15 +382,9 @@ with st.sidebar:
                 # we use a try...except block so the app doesnt crash if something goes wrong, like the website is down.
                 try:
                     cleaned_url = url.strip() # get rid of any accidental spaces around the url.
-                    # now 'requests' grabs the whole HTML content from that URL.
-                    html = requests.get(cleaned_url).text
-                    # 'readability' takes that HTML and pulls out just the main article content.
-                    doc = Document(html)
-                    clean_html = doc.summary()
-                    # 'BeautifulSoup' takes that clean HTML and strips out all the tags to give us plain text.
-                    soup = BeautifulSoup(clean_html, "html.parser")
-                    # just cleaning up the text a bit more, getting rid of extra lines and spaces.
-                    text = " ".join(soup.get_text(separator="\n", strip=True).split())
+                    # grab the article text (straight from the cache if we've seen this url before).
+                    # this runs in a background thread so the app doesnt freeze while we wait.
+                    text = run_in_background(fetch_article, cleaned_url, status_text=lambda: "Downloading the article...")
                     # and finally, save our clean text into the session state memory.
                     st.session_state.article_text = text
                 except Exception as e:
@@ -152,47 +403,33 @@ with st.sidebar:
         if st.button("Generate Quiz"):
             with st.spinner("Generating quiz..."):
                 try:
-                    # grab the article text that we already have stored in the session state.
-                    article_text_for_quiz = st.session_state.article_text
-                    
-                    # now we call our LLM chain.
-                    # we give it the article text and the number of questions the user wants.
-                    raw_output = chain.invoke({
-                        "article_text": article_text_for_quiz,
-                        "num_questions": num_questions
-                    })
-
-                    # sometimes the LLM likes to add extra text around the JSON.
-                    # this regex just pulls out the part that starts with '[' and ends with ']', which is our JSON data.
-                    match = re.search(r"\[.*\]", raw_output, re.DOTALL)
-                    if match:
-                        # if we found the JSON, convert it from a string to a Python list/dictionary.
-                        json_str = match.group(0)
-                        result = json.loads(json_str)
-                        
-                        # now we double-check if the LLM gave us good data.
-                        is_valid = True
-                        for q_item in result:
-                            # every question has to have a 'question', 'options', and 'correct_answer'.
-                            if not all(key in q_item for key in ["question", "options", "correct_answer"]):
-                                is_valid = False
-                                st.error("The LLM returned incomplete data. Please try again.")
-                                break
-                        
-                        # if everything looks good, save the quiz data to the session state.
-                        if is_valid:
-                            st.session_state.quiz_data = result
-                            st.session_state.submitted = False
-                            # *** THIS IS THE KEY STEP FOR THIS FEATURE ***
-                            # after the quiz is made, we clear the article text from the session state.
-                            # this makes it disappear from the screen. gives it that exam feel.
-                            st.session_state.article_text = "" 
-                            st.success("Quiz Generated! Good luck!")
-                    else:
-                        st.error("Could not find valid JSON. Please try again.")
-                
-                except json.JSONDecodeError:
+                    # grab the article text that we already have stored in the session state,
+                    # and get a quiz for it (straight from the cache if we already made this exact one).
+                    # generate_quiz writes how many questions are done into 'counter',
+                    # and run_in_background shows it on the page while we wait.
+                    counter = {"done": 0}
+                    # just like fetching, the LLM call runs in a background thread.
+                    result = run_in_background(
+                        generate_quiz, st.session_state.article_text, num_questions, counter,
+                        status_text=lambda: f"Generated {counter['done']}/{num_questions} questions..."
+                    )
+
+                    # if everything looks good, save the quiz data to the session state.
+                    st.session_state.quiz_data = result
+                    st.session_state.submitted = False
+                    # *** THIS IS THE KEY STEP FOR THIS FEATURE ***
+                    # after the quiz is made, we clear the article text from the session state.
+                    # this makes it disappear from the screen. gives it that exam feel.
+                    st.session_state.article_text = "" 
+                    st.success("Quiz Generated! Good luck!")
+
+                except orjson.JSONDecodeError:
                     st.error("Failed to parse LLM output. The format was invalid.")
+                except ValidationError:
+                    st.error("The LLM returned incomplete data. Please try again.")
+                except ValueError as e:
+                    # these are the "bad data from the LLM" errors raised inside generate_quiz.
+                    st.error(str(e))
                 except Exception as e:
                     st.error(f"An error occurred: {str(e)}")
 
@@ -223,12 +460,15 @@ if st.session_state.quiz_data:
         for idx, q in enumerate(quiz_data, start=1):
             st.markdown(f"**Q{idx}. {q.get('question', 'Error: Question not found')}**")
             
+            # grab the options dict once, instead of looking it up again for every single option.
+            opts = q.get("options", {})
             # create the radio buttons (options) for each question.
             user_choice = st.radio(
                 label="Options",
-                options=list(q.get("options", {}).keys()), # the options will be 'A', 'B', 'C', 'D'
+                options=list(opts.keys()), # the options will be 'A', 'B', 'C', 'D'
                 # format_func is just to make the options look nice, like "A: Option text".
-                format_func=lambda opt: f"{opt}: {q.get('options', {}).get(opt, '')}",
+                # 'opts=opts' locks in this question's options so the lambda doesnt have to look them up again.
+                format_func=lambda opt, opts=opts: f"{opt}: {opts.get(opt, '')}",
                 key=f"q_{idx}", # every radio button needs a unique key.
                 label_visibility="collapsed", # hide the "Options" label, its not needed.
                 disabled=st.session_state.submitted, # if the quiz is submitted, disable the options.
@@ -236,12 +476,14 @@ if st.session_state.quiz_data:
             )
         
         # the submit button for the form.
-        submitted = st.form_submit_button("Submit Answers")
-        if submitted:
-            # if the user clicks submit, we set 'submitted' to True in our memory.
-            st.session_state.submitted = True
-            # st.rerun() just reloads the page immediately to show the results.
-            st.rerun()
+        # on_click runs *before* streamlit reruns the script, so 'submitted' is already True when the
+        # radio buttons above get drawn. that means they show up locked in the same pass as the results,
+        # without needing an extra st.rerun(). the button itself is also disabled once the quiz is submitted.
+        st.form_submit_button(
+            "Submit Answers",
+            on_click=lambda: st.session_state.update(submitted=True),
+            disabled=st.session_state.submitted
+        )
 
 # this final section runs only after the quiz has been submitted.
 if st.session_state.submitted and st.session_state.quiz_data:
@@ -266,9 +508,10 @@ if st.session_state.submitted and st.session_state.quiz_data:
         st.markdown(f"**Q{idx}. {q.get('question', 'Error: Question not found')}**")
         user_choice = st.session_state[f'q_{idx}']
         correct_answer = q.get('correct_answer')
+        opts = q.get("options", {})
 
         # loop through each option and show it with color-coding.
-        for opt_key, opt_val in q.get("options", {}).items():
+        for opt_key, opt_val in opts.items():
             # if the option is the correct answer, show it in a green success box.
             if correct_answer and opt_key == correct_answer:
                 st.success(f"{opt_key}: {opt_val} (Correct Answer)")
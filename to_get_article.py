@@ -1,20 +1,45 @@
-from bs4 import BeautifulSoup           ## Python library to parse HTML and extract data
-import requests                          ## Used to make HTTP requests to fetch the HTML of the news page.
+import asyncio                           ## Lets us run several downloads at the same time instead of one after another.
+import httpx                             ## Async HTTP client (keep-alive connection pool + HTTP/2) to fetch the HTML of the news pages.
+import lxml.html                         ## Fast C-based library to parse HTML and extract data (no BeautifulSoup layer needed).
 from readability import Document         ##  Part of the readability-lxml package, isolates the main readable content of a webpage (removes sidebars, ads, etc.).
 
-url = "https://www.ndtv.com/world-news/india-endorses-us-russia-summit-in-alaska-cites-pm-modis-remark-9053353"
-html = requests.get(url).text
-## Sends an HTTP GET request to the URL.
-## .text returns the HTML source code as a string.
+urls = [
+    "https://www.ndtv.com/world-news/india-endorses-us-russia-summit-in-alaska-cites-pm-modis-remark-9053353",
+]   ## Add more article links here, they all get fetched together.
 
-doc = Document(html)   ##  Initializes Readability’s article parser on the HTML content.
-clean_html = doc.summary()  # main article HTML only Returns only the main article HTML (removes headers, footers, menus, ads, etc.).
-soup = BeautifulSoup(clean_html, "html.parser")  ##Creates a BeautifulSoup object to work with the article HTML.
-# "html.parser" → Tells BeautifulSoup to use Python’s built-in HTML parser.
 
-# Remove images
-for img in soup.find_all("img"):   ## Finds every <img> tag in the article HTML.
-    img.decompose()           ## Completely removes those tags from the parsed document.
+async def fetch_all(urls):
+    ## One AsyncClient keeps connections alive and (with HTTP/2) sends many requests over the same connection.
+    async with httpx.AsyncClient(
+        limits=httpx.Limits(max_connections=20, max_keepalive_connections=10),
+        timeout=15.0,
+        http2=True,
+        headers={"User-Agent": "Mozilla/5.0 (compatible; AIQuizGenerator/1.0)"},  ## Some sites block the default python user agent.
+        follow_redirects=True,
+    ) as client:
+        return await asyncio.gather(*(client.get(u) for u in urls), return_exceptions=True)
+        ## Fires every GET request at once and waits for all of them, so N pages take about as long as the slowest one.
+        ## return_exceptions=True → a URL that fails (timeout, DNS, ...) comes back as its error instead of aborting the whole batch.
 
-article_text = soup.get_text(separator="\n", strip=True)   ## Puts each block of text on a new line.
-print(article_text)
\ No newline at end of file
+
+responses = asyncio.run(fetch_all(urls))
+## .text on each response returns the HTML source code as a string.
+
+for url, response in zip(urls, responses):
+    if isinstance(response, Exception):   ## This URL failed to download, report it and move on to the next one.
+        print(f"Failed to fetch {url}: {response!r}")
+        continue
+    if not response.is_success:           ## 4xx/5xx error pages are not articles, so dont run them through readability.
+        print(f"Failed to fetch {url}: HTTP {response.status_code}")
+        continue
+
+    doc = Document(response.text)   ##  Initializes Readability’s article parser on the HTML content.
+    clean_html = doc.summary(html_partial=True)  # main article HTML only Returns only the main article HTML (removes headers, footers, menus, ads, etc.), as a bare <div> without the <html>/<body> wrapper.
+    tree = lxml.html.fromstring(clean_html)  ## Parses the article HTML straight into an lxml element tree.
+
+    # Remove images
+    for img in list(tree.iter("img")):   ## Finds every <img> tag in document order (no XPath engine needed). list() so we dont change the tree while walking it.
+        img.drop_tree()           ## Completely removes those tags from the tree in one C call (keeps any text that came after them).
+
+    article_text = "\n".join(t.strip() for t in tree.itertext() if t.strip())   ## Puts each block of text on a new line.
+    print(article_text)
\ No newline at end of file